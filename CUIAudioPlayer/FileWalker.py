@@ -1,7 +1,7 @@
+import os
 import pathlib
 import soundfile as sf
-from tinytag import TinyTag
-from typing import Generator, Union, List
+from typing import Generator, Union, List, Dict, Tuple
 
 from LoggingConfigurator import logger
 
@@ -18,8 +18,8 @@ else:
 class PathWrapper:
     primary_formats = set("." + key.lower() for key in sf.available_formats().keys())
     secondary_formats = {".m4a", ".mp3"} if PY_DUB_ENABLED else set()
-    supported_formats = primary_formats | secondary_formats
-    supported_formats = supported_formats | set(key.upper() for key in supported_formats)
+    # lowercase only, suffixes are lowered before lookup for case-insensitive match.
+    supported_formats = frozenset(primary_formats | secondary_formats)
 
     # re_match_pattern = "$|".join(final_supported_formats)
     # subtypes = soundfile.available_subtypes()
@@ -31,9 +31,15 @@ class PathWrapper:
         self.current_path = pathlib.Path(path).absolute()
         self.audio_file_list: List[pathlib.Path] = []
         self.folder_list: List[pathlib.Path] = []
+        self._audio_index: Dict[pathlib.Path, int] = {}
+
+        # directory -> (mtime_ns, audio files, folders, audio index)
+        self._scan_cache: Dict[
+            pathlib.Path, Tuple[int, List[pathlib.Path], List[pathlib.Path], Dict[pathlib.Path, int]]
+        ] = {}
 
     def list_audio(self) -> Generator[pathlib.Path, None, None]:
-        yield from (path_obj for path_obj in self.list_file() if path_obj.suffix in self.supported_formats)
+        yield from (path_obj for path_obj in self.list_file() if path_obj.suffix.lower() in self.supported_formats)
 
     def list_folder(self) -> Generator[pathlib.Path, None, None]:
         """
@@ -41,14 +47,38 @@ class PathWrapper:
         """
 
         yield self.current_path.parent
-        yield from (path_ for path_ in self.current_path.iterdir() if path_.is_dir())
+
+        with os.scandir(self.current_path) as entries:
+            yield from (pathlib.Path(entry.path) for entry in entries if entry.is_dir())
 
     def list_file(self) -> Generator[pathlib.Path, None, None]:
         """
         Can't use glob as it match folders such as .git, using pathlib.Path object instead.
         """
 
-        yield from (item for item in self.current_path.iterdir() if item.is_file())
+        with os.scandir(self.current_path) as entries:
+            yield from (pathlib.Path(entry.path) for entry in entries if entry.is_file())
+
+    def _scan_directory(self) -> Tuple[List[pathlib.Path], List[pathlib.Path]]:
+        """
+        Lists audio files and folders of current directory in single pass.
+        DirEntry caches file type from directory listing, so most entries don't need stat call.
+
+        :return: audio file list, folder list with parent directory as first element
+        """
+
+        audio_files = []
+        folders = [self.current_path.parent]
+        supported = self.supported_formats
+
+        with os.scandir(self.current_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    folders.append(pathlib.Path(entry.path))
+                elif entry.is_file() and os.path.splitext(entry.name)[1].lower() in supported:
+                    audio_files.append(pathlib.Path(entry.path))
+
+        return audio_files, folders
 
     def step_in(self, directory_idx: int):
         """
@@ -74,20 +104,54 @@ class PathWrapper:
         return self.current_path
 
     def refresh_list(self):
+        """
+        Updates file and folder list of current directory.
+        Directory is only scanned again if its modification time changed since last scan.
+        """
+
+        mtime = self.current_path.stat().st_mtime_ns
+
+        try:
+            cached = self._scan_cache[self.current_path]
+        except KeyError:
+            cached = None
+
+        if cached is None or cached[0] != mtime:
+            audio_files, folders = self._scan_directory()
+
+            # lookup table for index(), so finding playing track doesn't scan whole list.
+            audio_index = {path_: idx for idx, path_ in enumerate(audio_files)}
+
+            cached = mtime, audio_files, folders, audio_index
+            self._scan_cache[self.current_path] = cached
+
+        _, audio_files, folders, self._audio_index = cached
+
         self.audio_file_list.clear()
         self.folder_list.clear()
 
-        self.audio_file_list.extend(self.list_audio())
-        self.folder_list.extend(self.list_folder())
+        self.audio_file_list.extend(audio_files)
+        self.folder_list.extend(folders)
+
+    def invalidate_cache(self):
+        """
+        Forgets all cached directory scans, forcing next refresh_list to scan again.
+        """
+
+        self._scan_cache.clear()
 
     def fetch_meta(self):
         # This might have to deal the cases such as path changing before generator fires up.
+        from tinytag import TinyTag
+
         for file_dir in self.list_audio():
-            yield TinyTag.get(file_dir)
+            yield TinyTag.get(file_dir, image=False)
 
     def fetch_tag_data(self):
+        from tinytag import TinyTag
+
         for file_dir in self.list_audio():
-            yield TinyTag.get(file_dir)
+            yield TinyTag.get(file_dir, image=False)
 
     def __len__(self):
         return len(self.folder_list) + len(self.audio_file_list)
@@ -105,7 +169,7 @@ class PathWrapper:
     def index(self, target: Union[str, pathlib.Path]):
         path_ = pathlib.Path(target)
         try:
-            return len(self.folder_list) + self.audio_file_list.index(path_)
-        except ValueError as err:
+            return len(self.folder_list) + self._audio_index[path_]
+        except KeyError as err:
             raise IndexError(f"Cannot find given target '{path_.as_posix()}'!") from err
 
@@ -1,8 +1,47 @@
+import sys
 import logging
 import inspect
+import queue
+import threading
 
 from loguru import logger
 assert logger
+
+
+# Log records from audio threads, formatted and emitted by a separate thread so callbacks never wait on sinks.
+_deferred_queue = queue.SimpleQueue()
+
+
+def _drain_deferred():
+    while True:
+        level, message, args, origin = _deferred_queue.get()
+
+        # record is emitted from here, so caller detail captured on queueing is restored onto it.
+        name, function, line = origin
+        logger.patch(
+            lambda record: record.update(name=name, module=name.rpartition(".")[2], function=function, line=line)
+        ).log(level, message, *args)
+
+
+threading.Thread(target=_drain_deferred, name="DeferredLogger", daemon=True).start()
+
+
+def log_deferred(level: str, message: str, *args):
+    """
+    Queues log record to be emitted outside caller's thread. Use this in audio callback paths.
+    Message is formatted by loguru with str.format style placeholders, on drain thread.
+
+    :param level: loguru level name such as "DEBUG"
+    :param message: message with {} placeholders
+    :param args: arguments to format message with
+    """
+
+    frame = sys._getframe(1)
+    origin = frame.f_globals.get("__name__"), frame.f_code.co_name, frame.f_lineno
+
+    _deferred_queue.put_nowait((level, message, args, origin))
+
+
 # all below are now deprecated
 
 LOG_DETAILED_CALLER = True
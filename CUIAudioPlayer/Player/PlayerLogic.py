@@ -4,22 +4,26 @@ Combined logic with TUI and PlayerLogixMixin.
 
 from __future__ import annotations
 
+import re
 import itertools
+from concurrent.futures import ThreadPoolExecutor, Future
 from contextlib import contextmanager
-from typing import TYPE_CHECKING, Iterable, Callable, Type, Tuple, Union
+from typing import TYPE_CHECKING, Iterable, Callable, Type, Tuple, Union, List, Dict
 
 import py_cui
 from FileWalker import PathWrapper
-from SDManager.StreamManager import StreamManager, NoAudioPlayingError
+from SDManager.StreamManager import StreamManager
 from LoggingConfigurator import logger
 from .TUI import AudioPlayerTUI
 from .PlayerStates import PlayerStates, AudioUnloaded, AudioRunning
 from . import (
     add_callback_patch,
+    add_resize_patch,
     fit_to_actual_width,
     fit_to_actual_width_multiline,
     extract_meta,
     meta_list_str_gen,
+    META_CACHE_SIZE,
     gen_progress_bar,
 )
 
@@ -38,43 +42,43 @@ class PlayerLogicMixin:
 
     def init_playlist(self: AudioPlayer):
         """
-        Create itertools.cycle generator that acts as a playlist
+        Snapshot tracks in current directory as a playlist, positioned at currently playing track.
         """
 
         # Shuffling is harder than imagined!
         # https://engineering.atspotify.com/2014/02/28/how-to-shuffle-songs/
-        copy = [i for i in self.path_wrapper.audio_file_list]
-        cycle_gen = itertools.cycle(
-            copy
-        )
-
-        while next(cycle_gen) != self.current_playing_file:
-            pass
+        self._playlist = tuple(self.path_wrapper.audio_file_list)
+        self._playlist_idx = self._playlist.index(self.current_playing_file)
 
-        self._current_play_generator = cycle_gen
-        logger.debug(f"Initialized playlist generator from directory '{self.path_wrapper.current_path.as_posix()}'")
+        logger.debug(f"Initialized playlist from directory '{self.path_wrapper.current_path.as_posix()}'")
 
     def playlist_next(self: AudioPlayer):
         """
-        Get next track index to play.
+        Get next track to play, wrapping around at the end of playlist.
 
-        :return: Index of next soundtrack on PathWrapper
+        :return: pathlib.Path of next soundtrack
         """
 
-        return next(self._current_play_generator)
+        self._playlist_idx = (self._playlist_idx + 1) % len(self._playlist)
+        return self._playlist[self._playlist_idx]
 
     def get_absolute_size(
         self: AudioPlayer, widget: py_cui.widgets.Widget
     ) -> Tuple[int, int]:
         """
         Get absolute dimensions of widget including borders.
+        Result is cached until terminal is resized.
 
         :param widget: widget instance to get dimensions of
         :return: y-height and x-height
         """
 
-        abs_y, abs_x = widget.get_absolute_dimensions()
-        return abs_y - self.usable_offset_y, abs_x - self.usable_offset_x
+        try:
+            return self._size_cache[widget]
+        except KeyError:
+            abs_y, abs_x = widget.get_absolute_dimensions()
+            size = self._size_cache[widget] = abs_y - self.usable_offset_y, abs_x - self.usable_offset_x
+            return size
 
     @property
     def current_playing_idx(self: AudioPlayer) -> int:
@@ -84,6 +88,9 @@ class PlayerLogicMixin:
         :return: index of played file
         """
 
+        if self.current_playing_file is None:
+            raise IndexError("No track has been played yet.")
+
         return self.path_wrapper.index(self.current_playing_file)
 
 
@@ -95,18 +102,26 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
     def __init__(self, root: py_cui.PyCUI):
         super().__init__(root)
 
+        # widget -> usable size, cleared on terminal resize.
+        self._size_cache: Dict[py_cui.widgets.Widget, Tuple[int, int]] = {}
+
         self.play_btn.command = self._play_cb_space_bar
         self.stop_btn.command = self._on_stop_click
         self.reload_btn.command = self._on_reload_click
         self.next_btn.command = self._on_next_track_click
         # self.prev_btn.command = lambda a=None: None
 
-        self.clear_target = (self.audio_list, self.meta_list, self.info_box)
+        # audio_list is excluded, refresh_list decides whether it needs rewriting.
+        self.clear_target = (self.meta_list, self.info_box)
 
         # -- UI setup
-        add_callback_patch(self.audio_list, self._on_file_click)
-        add_callback_patch(self.volume_slider, self.volume_callback, keypress_only=True)
+        self.audio_list.set_on_selection_change_event(self._on_file_click)
+        add_callback_patch(
+            self.volume_slider, self.volume_callback, keypress_only=True, state_getter=self.volume_slider.get_slider_value
+        )
+        add_resize_patch(root, self._size_cache.clear)
         root.run_on_exit(self._tui_destroy_callback)
+        root.set_on_draw_update_func(self._flush_progress)
 
         # -- Key binds
         self.audio_list.add_key_command(py_cui.keys.KEY_ENTER, self._play_cb_enter)
@@ -130,14 +145,9 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
         # -- Color rules
         self.info_box.add_text_color_rule("ERR:", py_cui.WHITE_ON_RED, "startswith")
 
+        # single rule for all marks, states are exclusive so one search per line is enough.
         self.audio_list.add_text_color_rule(
-            self.symbols["play"], py_cui.WHITE_ON_YELLOW, "contains"
-        )
-        self.audio_list.add_text_color_rule(
-            self.symbols["pause"], py_cui.WHITE_ON_YELLOW, "contains"
-        )
-        self.audio_list.add_text_color_rule(
-            self.symbols["stop"], py_cui.WHITE_ON_YELLOW, "contains"
+            f"[{''.join(map(re.escape, self.symbols.values()))}]", py_cui.WHITE_ON_YELLOW, "contains"
         )
         self.audio_list.add_text_color_rule(
             r"DIR", py_cui.CYAN_ON_BLACK, "startswith", include_whitespace=False
@@ -148,17 +158,28 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
         self.initial_volume_position = self.volume_slider.get_slider_value()
         self.global_volume_multiplier = 0.4
         self._digit: int = 0
+        self._listing_snapshot: Union[Tuple, None] = None
+        self._meta_shown: Union[Tuple, None] = None
+
+        # -- Progress, published by audio thread and drawn by TUI thread
+        self._pending_progress: Union[Tuple[AudioObject.AudioInfo, int], None] = None
+        self._show_playing = self.show_progress_wrapper()
 
         # -- Path and stream instance
-        self.stream = StreamManager(self.show_progress_wrapper(), self.play_next)
+        self.stream = StreamManager(self._publish_progress, self.play_next)
         self.volume_callback()
         self.path_wrapper = PathWrapper()
         self.current_playing_file: Union[pathlib.Path, None] = None
 
-        # -- Generator instance and states
-        self._current_play_generator = None
+        # -- Playlist and generator instance
+        self._playlist: Tuple[pathlib.Path, ...] = ()
+        self._playlist_idx = 0
         self._current_name_cycler = None
 
+        # -- Background metadata parsing
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="MetaPrefetch")
+        self._prefetch_futures: List[Future] = []
+
         self._on_reload_click()
 
     # Primary callbacks
@@ -267,8 +288,13 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
             self.write_info(msg)
             return False
 
+        # revert marking of previous track, if it's in current listing.
+        try:
+            self.reset_marking(self.current_playing_idx)
+        except IndexError:
+            pass
+
         self.current_playing_file = audio_file
-        self.refresh_list(search_files=False)
         self.stream.start_stream()
 
         if not next_:
@@ -281,42 +307,77 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
     def refresh_list(self, search_files=True):
         """
         Refresh directory contents. If search_files is True, will also update cached files list.
+        Rewriting audio_list is skipped if search found same files as currently displayed.
         Will separate this after changing list generating method to use internal item list of ScrollWidget.
 
         :param search_files: Flag whether to update cached files list
         """
 
-        self.audio_list.clear()
-
         if search_files:
             self.path_wrapper.refresh_list()
 
+        self.write_info(f"Found {len(self.path_wrapper.audio_file_list)} file(s).")
+        self.audio_list.set_title(
+            f"Audio List - " f"{len(self.path_wrapper.audio_file_list)} track(s)"
+        )
+
+        # width is included so rows get fit again after resizing.
+        snapshot = (
+            tuple(self.path_wrapper.folder_list),
+            tuple(self.path_wrapper.audio_file_list),
+            self.get_absolute_size(self.audio_list),
+        )
+
+        # prefetch even for unchanged listing, as reload empties metadata cache beforehand.
+        if search_files:
+            self._prefetch_meta()
+
+        if search_files and snapshot == self._listing_snapshot and self.audio_list.get_item_list():
+            return
+
+        self._listing_snapshot = snapshot
+
         digits = len(str(len(self.path_wrapper.audio_file_list))) + 2
         self._digit = digits
 
-        def folder_gen():
-            format_ = f"{('DIR'.ljust(digits))[:digits]}| "
-            yield format_ + ".."
-            for dir_n in itertools.islice(self.path_wrapper.folder_list, 1, None):
-                yield format_ + str(dir_n.name)
+        # index is right-aligned with a trailing space, so marker column stays at `digits`.
+        dir_prefix = f"{('DIR'.ljust(digits))[:digits]}| "
+        audio_format = f"{{:>{digits - 1}}} | {{}}"
 
-        def audio_gen():
-            for idx, file_dir in enumerate(self.path_wrapper.audio_file_list):
-                yield f"{str(idx).center(digits)}| {file_dir.name}"
+        lines = [dir_prefix + ".."]
+        lines += [dir_prefix + dir_n.name for dir_n in itertools.islice(self.path_wrapper.folder_list, 1, None)]
+        lines += [audio_format.format(idx, file_dir.name) for idx, file_dir in enumerate(self.path_wrapper.audio_file_list)]
 
-        self.write_audio_list(itertools.chain(folder_gen(), audio_gen()))
-        self.write_info(f"Found {len(self.path_wrapper.audio_file_list)} file(s).")
-        self.audio_list.set_title(
-            f"Audio List - " f"{len(self.path_wrapper.audio_file_list)} track(s)"
-        )
+        self.write_audio_list(lines)
 
     def _update_meta(self):
         """
-        Updates metadata to show selected item.
+        Updates metadata to show selected item. Skipped if same item is already shown in same width.
         """
 
-        ordered = extract_meta(self.selected_idx_path)
+        path = self.selected_idx_path
+        shown = (path, self.get_absolute_size(self.meta_list))
+
+        if shown == self._meta_shown:
+            return
+
+        ordered = extract_meta(path)
         self.write_meta_list(meta_list_str_gen(ordered), wrap_line=True)
+        self._meta_shown = shown
+
+    def _prefetch_meta(self):
+        """
+        Parses metadata of tracks in current directory on background, so selecting them later hits the cache.
+        Pending jobs from previous directory are cancelled.
+        """
+
+        for future in self._prefetch_futures:
+            future.cancel()
+
+        self._prefetch_futures = [
+            self._prefetch_pool.submit(extract_meta, file_dir)
+            for file_dir in itertools.islice(self.path_wrapper.audio_file_list, META_CACHE_SIZE)
+        ]
 
     def _clear_meta(self):
         """
@@ -324,6 +385,7 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
         """
 
         self.meta_list.clear()
+        self._meta_shown = None
 
     # Implementation / helper / wrappers -----------------------
 
@@ -394,6 +456,7 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
     def _mark_target(self, track_idx, replace_target: str):
         """
         internal function that changes search_target in line at index to replace_target.
+        Line is replaced in-place, leaving rest of audio_list untouched.
 
         :param track_idx: index of item to mark
         :param replace_target: string to replace with
@@ -405,7 +468,6 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
         source[track_idx] = (
             string[: self._digit] + replace_target + string[self._digit + 1:]
         )
-        self.write_audio_list(source)
 
     def reset_marking(self, track_idx):
         """
@@ -447,42 +509,59 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
         self, paused=False
     ) -> Callable[[AudioObject.AudioInfo, int], None]:
         """
-        Wrapper for function that handles progress. Returning callable that is meant to run in sounddevice callback.
+        Wrapper for function that handles progress. Returning callable that draws progress, meant to run on TUI thread.
 
         :param paused: if True, change message to display paused state.
 
-        :return: Callback for sounddevice Numpy sound stream
+        :return: Callable taking AudioInfo and current frame
         """
 
         message = "Paused" if paused else "Playing now"
 
-        def digit(int_):
-            return len(str(int_))
-
         def show_progress(audio_info: AudioObject.AudioInfo, current_frame):
+            if paused:
+                # stream is stopped by now, drop progress it published so it won't overwrite this.
+                self._pending_progress = None
 
             file_name = audio_info.title
             max_frame = audio_info.total_frame
 
-            duration = audio_info.duration_tag
-            duration_digit = digit(duration)
-
-            format_specifier = f"0{duration_digit}.1f"
-            time_string = (
-                f"|{current_frame * duration / max_frame:{format_specifier}}/{duration}"
+            time_string = audio_info.progress_format.format(
+                current_frame * audio_info.duration_tag / max_frame
             )
 
-            _, x_width = self.info_box.get_absolute_dimensions()
+            # title spans whole widget width minus 2 border corners, size is cached until resize.
+            _, usable_x = self.get_absolute_size(self.info_box)
+            bar_width = usable_x + self.usable_offset_x - 2 - len(time_string)
 
             self.info_box.set_title(
                 f"{time_string}"
-                f"{gen_progress_bar(current_frame / max_frame, x_width - len(time_string) - 2)}"
+                f"{gen_progress_bar(current_frame / max_frame, bar_width)}"
             )
 
             self.write_info(f"{message} - {file_name}")
 
         return show_progress
 
+    def _publish_progress(self, audio_info: AudioObject.AudioInfo, current_frame: int):
+        """
+        Stream callback. Only stores latest progress, as drawing from audio thread can stall playback.
+
+        :param audio_info: AudioInfo of playing track
+        :param current_frame: current playback position in frames
+        """
+
+        self._pending_progress = audio_info, current_frame
+
+    def _flush_progress(self):
+        """
+        Draws latest progress published by audio thread. Called by py_cui on every draw.
+        """
+
+        if (progress := self._pending_progress) is not None:
+            self._pending_progress = None
+            self._show_playing(*progress)
+
     # Playlist control callback --------------------------------
 
     def play_next(self):
@@ -490,12 +569,12 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
         Play next track. Called by finished callback of sounddevice when conditions are met.
         """
 
-        logger.debug(f"Stop Flag: {self.stream.stop_flag}")
+        logger.debug("Stop Flag: {}", self.stream.stop_flag)
 
         if not self.stream.stop_flag:
             next_ = self.playlist_next()
 
-            logger.debug(f"Playing Next - {next_}")
+            logger.debug("Playing Next - {}", next_)
 
             with self.maintain_current_view():
                 if not self.play_stream(next_, True):
@@ -506,7 +585,7 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
                 else:
                     # update state
                     self.player_state = AudioRunning
-                    logger.debug(f"Next track started, state: {self.player_state}")
+                    logger.debug("Next track started, state: {}", self.player_state)
                     try:
                         self.mark_as_playing(self.current_playing_idx)
                     except IndexError:
@@ -550,7 +629,6 @@ class AudioPlayer(AudioPlayerTUI, PlayerLogicMixin):
             self.audio_list._top_view = visible_idx
 
     def _tui_destroy_callback(self):
-        try:
-            self.stream.stop_stream()
-        except (RuntimeError, NoAudioPlayingError):
-            pass
+        self._prefetch_pool.shutdown(wait=False, cancel_futures=True)
+
+        self.stream.close()
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING
 
 from LoggingConfigurator import logger
 from SDManager.StreamManager import StreamManager, NoAudioPlayingError
+from . import fit_to_actual_width, clear_meta_cache
 
 if TYPE_CHECKING:
     from .PlayerLogic import AudioPlayer
@@ -52,8 +53,6 @@ class PlayerStates:
             return
 
         with audio_player.maintain_current_view():
-            # revert texts
-            audio_player.refresh_list(search_files=False)
             try:
                 audio_player.mark_as_stopped(audio_player.current_playing_idx)
             except IndexError:
@@ -77,12 +76,26 @@ class PlayerStates:
 
         PlayerStates.on_stop_click(audio_player)
 
+        # stream is replaced below, so revert marking of loaded track.
+        try:
+            audio_player.reset_marking(audio_player.current_playing_idx)
+        except IndexError:
+            pass
+
         # clear widgets
 
         for widget in audio_player.clear_target:
             widget.clear()
 
-        audio_player.stream = StreamManager(audio_player.show_progress_wrapper(), audio_player.play_next)
+        audio_player._meta_shown = None
+
+        # drop cached lines and metadata of previous listing
+        fit_to_actual_width.cache_clear()
+        clear_meta_cache()
+        audio_player.path_wrapper.invalidate_cache()
+
+        audio_player.stream.close()
+        audio_player.stream = StreamManager(audio_player._publish_progress, audio_player.play_next)
         audio_player.refresh_list(search_files=True)
         audio_player.volume_callback()
 
@@ -98,6 +111,9 @@ class PlayerStates:
             audio_player.path_wrapper.step_in(audio_player.selected_idx)
             # PlayerStates.on_reload_click(audio_player)
             audio_player.refresh_list(search_files=True)
+
+            # selection index may stay same while list changed, so py_cui won't fire selection event.
+            audio_player._on_file_click()
         else:
             # force play audio
             with audio_player.maintain_current_view():
@@ -282,7 +298,7 @@ class AudioPaused(PlayerStates):
 
         reference.seek(0 if offset > current_frame else (current_frame - offset))
 
-        logger.debug(f"Adjusted left from {current_frame} to {reference.tell()}")
+        logger.debug("Adjusted left from {} to {}", current_frame, reference.tell())
 
         # Trigger playback callback to display new values
         callback = audio_player.show_progress_wrapper(paused=True)
@@ -305,7 +321,7 @@ class AudioPaused(PlayerStates):
         else:
             reference.seek(current_frame + offset)
 
-        logger.debug(f"Adjusted right from {current_frame} to {reference.tell()}")
+        logger.debug("Adjusted right from {} to {}", current_frame, reference.tell())
 
         # Trigger playback callback to display new values
         callback = audio_player.show_progress_wrapper(paused=True)
@@ -1,14 +1,36 @@
+import os
 import functools
 import itertools
+import threading
 from collections import OrderedDict
-from typing import Callable, Mapping, Generator, Iterator, Tuple, Sequence
+from typing import Callable, Mapping, Generator, Tuple, Sequence, List
 
 import py_cui
-from wcwidth import wcwidth, wcswidth
-from tinytag import TinyTag
 
+try:
+    # C implementation of wcwidth, considerably faster on per-character width lookups.
+    # noinspection PyUnresolvedReferences
+    from cwcwidth import wcwidth
+except ImportError:
+    from wcwidth import wcwidth
 
-def add_callback_patch(widget_: py_cui.widgets.Widget, callback: Callable, keypress_only=False):
+
+class _CharWidthTable(dict):
+    """
+    Character to display width table, filled lazily so each distinct character hits wcwidth only once.
+    """
+
+    def __missing__(self, char: str) -> int:
+        self[char] = width = wcwidth(char)
+        return width
+
+
+CHAR_WIDTH = _CharWidthTable()
+
+
+def add_callback_patch(
+    widget_: py_cui.widgets.Widget, callback: Callable, keypress_only=False, state_getter: Callable = None
+):
     """
     Adding callback support for widget that lacks such as ScrollMenu.
 
@@ -16,6 +38,7 @@ def add_callback_patch(widget_: py_cui.widgets.Widget, callback: Callable, keypr
         widget_: Any widget you want to add callback on each input events.
         callback: Any callables
         keypress_only: Decides whether to replace mouse input handler alongside with key input one.
+        state_getter: If given, callback is only called when its return value changed by the input event.
     """
 
     # Sequence is _draw -> _handle_mouse_press, so patching on _draw results 1 update behind.
@@ -23,76 +46,175 @@ def add_callback_patch(widget_: py_cui.widgets.Widget, callback: Callable, keypr
 
     def patch_factory(old_func):
         # fix for late binding issue: stackoverflow.com/questions/3431676
-        @functools.wraps(old_func)
-        def wrapper(*args, **kwargs):
-            old_func(*args, **kwargs)
-            callback()
-
+        if state_getter is None:
+            @functools.wraps(old_func)
+            def wrapper(*args, **kwargs):
+                old_func(*args, **kwargs)
+                callback()
+        else:
+            @functools.wraps(old_func)
+            def wrapper(*args, **kwargs):
+                old_state = state_getter()
+                old_func(*args, **kwargs)
+                if state_getter() != old_state:
+                    callback()
+
+        # marking wrapper so patching again with same callback doesn't stack wrappers.
+        wrapper.__patched_by__ = callback
         return wrapper
 
-    setattr(widget_, "_handle_key_press", patch_factory(getattr(widget_, "_handle_key_press")))
+    def patch(target):
+        old_func = getattr(widget_, target)
+
+        # bound methods are created per attribute access, so compare by equality instead of identity.
+        if getattr(old_func, "__patched_by__", None) == callback:
+            return
+
+        setattr(widget_, target, patch_factory(old_func))
+
+    patch("_handle_key_press")
     if not keypress_only:
-        setattr(widget_, "_handle_mouse_press", patch_factory(getattr(widget_, "_handle_mouse_press")))
+        patch("_handle_mouse_press")
+
+
+META_CACHE_SIZE = 256
+_meta_cache: "OrderedDict[Tuple[str, int], dict]" = OrderedDict()
+_meta_cache_lock = threading.Lock()
+
+
+def add_resize_patch(root: py_cui.PyCUI, callback: Callable):
+    """
+    Adding callback support for terminal resize events, which py_cui lacks.
+
+    Args:
+        root: PyCUI instance to watch resizing of.
+        callback: Any callables, called after widgets are resized.
+    """
+
+    old_func = getattr(root, "_refresh_height_width")
+
+    if getattr(old_func, "__patched_by__", None) == callback:
+        return
+
+    @functools.wraps(old_func)
+    def wrapper(*args, **kwargs):
+        old_func(*args, **kwargs)
+        callback()
+
+    wrapper.__patched_by__ = callback
+    setattr(root, "_refresh_height_width", wrapper)
 
 
 def extract_meta(abs_file_dir):
     """
-    Extracts metadata as OrderedDict.
+    Extracts metadata as dict sorted by key.
+    Results are cached per file until file's modification time changes, or cache is cleared.
+    Thread-safe, so it can be called from prefetching workers.
 
     :param abs_file_dir: absolute location of audio file
 
-    :return: OrderedDict[str, Any]
+    :return: Dict[str, Any]
+    """
+
+    key = (str(abs_file_dir), os.stat(abs_file_dir).st_mtime_ns)
+
+    with _meta_cache_lock:
+        try:
+            _meta_cache.move_to_end(key)
+        except KeyError:
+            pass
+        else:
+            return _meta_cache[key]
+
+    from tinytag import TinyTag
+
+    tag = TinyTag.get(abs_file_dir, image=False)
+    meta = dict(sorted((k, v) for k, v in tag.as_dict().items() if v))
+
+    with _meta_cache_lock:
+        _meta_cache[key] = meta
+        if len(_meta_cache) > META_CACHE_SIZE:
+            _meta_cache.popitem(last=False)
+
+    return meta
+
+
+def clear_meta_cache():
+    """
+    Clears metadata cached by extract_meta.
     """
 
-    tag = TinyTag.get(abs_file_dir)
-    filtered = sorted(((k, v) for k, v in tag.as_dict().items() if v))
-    return OrderedDict(filtered)
+    with _meta_cache_lock:
+        _meta_cache.clear()
 
 
-def meta_list_str_gen(dict_: Mapping) -> Generator[str, None, None]:
+def meta_list_str_gen(dict_: Mapping) -> List[str]:
     """
-    Formats metadata. Returns generator that yields 3 lines per metadata entry.
+    Formats metadata. Returns list containing 3 lines per metadata entry.
+    Expects empty entries to be already filtered out, as extract_meta does.
 
     :param dict_: Mapping containing metadata.
 
-    :return: Generator[str, None, None]
+    :return: List[str]
     """
 
-    for key, val in ((k, v) for k, v in dict_.items() if v):
-        yield f"[{key}]"
-        yield f":{val}"
-        yield " "
+    lines = []
+    for key, val in dict_.items():
+        lines += (f"[{key}]", f":{val}", " ")
 
+    return lines
 
-def pad_actual_length(source: Iterator[str], pad: str = "\u200b") -> Tuple[str, Generator[str, None, None]]:
+
+class _WidePadTable(dict):
+    """
+    str.translate table that maps 2-width characters to itself followed by pad. Filled lazily per codepoint.
+    """
+
+    def __init__(self, pad: str):
+        super().__init__()
+        self.pad = pad
+
+    def __missing__(self, codepoint: int) -> str:
+        char = chr(codepoint)
+        self[codepoint] = translated = char + self.pad if CHAR_WIDTH[char] == 2 else char
+        return translated
+
+
+@functools.lru_cache(maxsize=None)
+def _wide_pad_table(pad: str) -> _WidePadTable:
+    return _WidePadTable(pad)
+
+
+def pad_actual_length(source: str, pad: str = "\u200b") -> Tuple[str, str]:
     """
     Determine real-displaying character length, and provide padding accordingly to match length.
     This way slicing will cut asian letters properly, not breaking tidy layouts.
     Don't expect to have 0-width characters in given string!
 
-    :param source: Original string to be manipulated. Accepts Iterator[str], allowing lazy generator.
+    :param source: Original string to be manipulated.
     :param pad: Default character to pad, default ZWSP
 
-    :return: padding character and lazy generator for padded string
+    :return: padding character and padded string
     """
 
-    def inner_gen(source_: Iterator[str]) -> Generator[str, None, None]:
-        for char in source_:
-            yield char
-            if wcwidth(char) == 2:
-                yield pad
+    # ASCII characters are always 1-width, isascii() is a flag check on CPython's compact strings.
+    if source.isascii():
+        return pad, source
 
-    return pad, inner_gen(source)
+    # translate runs per-character loop in C, table only calls wcwidth for unseen characters.
+    return pad, source.translate(_wide_pad_table(pad))
     # https://github.com/microsoft/terminal/issues/1472
     # Windows Terminal + (Powershell/CMD) combo can't run this due to ZWSP width issue.
     # Expected to run in purely CMD / Linux Terminal. or WSL + Windows Terminal.
     # Tested on Xfce4 & CMD.
 
 
+@functools.lru_cache(maxsize=4096)
 def fit_to_actual_width(text: str, length_lim: int) -> str:
     """
     Cuts given text with varying character width to fit inside given width.
     Expects that lines is short enough, will read entire lines on memory multiple times.
+    Results are cached, as same file names are fit into same width on every redraw.
 
     :param text: Source text
     :param length_lim: length limit in 1-width characters
@@ -102,18 +224,23 @@ def fit_to_actual_width(text: str, length_lim: int) -> str:
 
     ellipsis_ = "..."
 
-    # returns immediately if no action is needed
-    if wcswidth(text) != len(text):
+    # skip padding if no action is needed
+    if not text.isascii():
 
-        _, padded = pad_actual_length(text)
-        source = "".join(padded)
+        pad, source = pad_actual_length(text)
         limited = source[:length_lim]
 
         # if last character was 2-width, padding unicode wore off, so last 2-width character can't fit.
         # instead, pad with space for consistent ellipsis position.
-        if wcwidth(limited[-1]) == 2:
+        # Every 2-width character is followed by pad, so checking next character is enough.
+        if source[length_lim:length_lim + 1] == pad:
             limited = limited[:-1] + " "
     else:
+        # ASCII text that already fits is returned as-is.
+        if len(text) <= length_lim:
+            return text
+
+        pad = None
         source = text
         limited = text[:length_lim]
 
@@ -121,8 +248,8 @@ def fit_to_actual_width(text: str, length_lim: int) -> str:
     if len(source) > length_lim:
         limited = limited[:length_lim - len(ellipsis_)]
 
-        # check if last character was 2-width, if so, strip last char and add space
-        if wcwidth(limited[-1]):
+        # check if last character was 2-width or other visible character, if so, strip last char and add space
+        if limited[-1] != pad:
             limited = limited[:-1] + ' '
 
         limited += ellipsis_
@@ -142,7 +269,12 @@ def fit_to_actual_width_multiline(text: str, length_lim: int) -> Generator[str,
     :return: lazy generator yielding multi-line cut strings
     """
 
-    _, padded = pad_actual_length(text)
+    # ASCII text never has 2-width characters to carry over, plain slicing is enough.
+    if text.isascii() and length_lim > 0:
+        return (text[idx:idx + length_lim] for idx in range(0, len(text), length_lim))
+
+    _, padded_text = pad_actual_length(text)
+    padded = iter(padded_text)
 
     def generator():
         next_line = ''
@@ -162,7 +294,7 @@ def fit_to_actual_width_multiline(text: str, length_lim: int) -> Generator[str,
                 line_size = length_lim
 
             # check if last text was 2-width character. If so, move it to next_line and adjust next line_size.
-            if wcwidth(line[-1]) == 2:
+            if CHAR_WIDTH[line[-1]] == 2:
                 next_line = line[-1]
                 line = line[:-1]
                 line_size -= 1
@@ -1,29 +1,187 @@
+import time
+import weakref
 import pathlib
+import threading
+import numpy as np
 import soundfile as sf
-from tinytag import TinyTag
 
-from LoggingConfigurator import logger
+from LoggingConfigurator import logger, log_deferred
+
+
+class RingBufferedFile:
+    """
+    SoundFile wrapper that decodes ahead on background thread into a ring buffer.
+    Reading side only copies from the ring, so audio callback never waits on disk or codec.
+
+    Single producer (decoder thread), single consumer (audio callback). Positions only grow and
+    each side writes only its own, so no lock is taken on reading side.
+    seek() is expected to be called while stream is stopped, as SoundFile's one is.
+    """
+
+    # Decoding 16 stream blocks (1024 frames each) per libsndfile call, ring holds 4 of those chunks.
+    def __init__(self, file: sf.SoundFile, dtype="float32", buffer_frames=65536, chunk_frames=16384):
+        self._file = file
+        self.dtype = dtype
+        self.frames = file.frames
+        self.samplerate = file.samplerate
+        self.channels = file.channels
+
+        self._ring = np.zeros((buffer_frames, file.channels), dtype)
+        self._size = buffer_frames
+        self._chunk = chunk_frames
+
+        # file position of first frame in ring, and total frames produced / consumed since then.
+        self._base = 0
+        self._write_pos = 0
+        self._read_pos = 0
+        self._eof = False
+        self._closed = False
+
+        self.underrun_count = 0
+
+        # guards file and producer side against seek.
+        self._lock = threading.Lock()
+        self._poll_interval = chunk_frames / file.samplerate / 4
+
+        self._thread = threading.Thread(target=self._decode_loop, name="RingDecoder", daemon=True)
+        self._thread.start()
+
+    def _decode_loop(self):
+        ring = self._ring
+
+        # audio callback only counts underruns, reporting is done here where blocking is harmless.
+        reported = 0
+
+        while not self._closed:
+            with self._lock:
+                free = self._size - (self._write_pos - self._read_pos)
+
+                if self._eof or free < self._chunk:
+                    ready = False
+                else:
+                    # decode straight into ring, size limited to contiguous part up to the end.
+                    start = self._write_pos % self._size
+                    requested = min(self._chunk, self._size - start)
+                    read = len(self._file.read(requested, self.dtype, out=ring[start:start + requested]))
+
+                    self._write_pos += read
+                    self._eof = read < requested
+                    ready = True
+
+            if not ready:
+                if reported != (underrun := self.underrun_count):
+                    log_deferred("WARNING", "Decoder underrun - {} block(s) played as silence.", underrun - reported)
+                    reported = underrun
+
+                time.sleep(self._poll_interval)
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Copies buffered frames into out. Decoder underrun is filled with silence.
+
+        :param out: 2D array to copy frames into
+        :return: number of frames copied, less than out's length only at end of file.
+        """
+
+        frames = len(out)
+        eof = self._eof
+        read_pos = self._read_pos
+        count = min(frames, self._write_pos - read_pos)
+
+        start = read_pos % self._size
+        first = min(count, self._size - start)
+        out[:first] = self._ring[start:start + first]
+        out[first:count] = self._ring[:count - first]
+
+        self._read_pos = read_pos + count
+
+        if count == frames or eof:
+            return count
+
+        # decoder fell behind, play silence rather than stopping the stream.
+        out[count:] = 0
+        self.underrun_count += 1
+        return frames
+
+    def wait_buffered(self, timeout=0.5):
+        """
+        Blocks until ring is filled by a chunk or end of file is reached. Used before starting stream.
+
+        :param timeout: maximum seconds to wait
+        """
+
+        deadline = time.monotonic() + timeout
+        while not self._eof and self._write_pos - self._read_pos < self._chunk and time.monotonic() < deadline:
+            time.sleep(self._poll_interval / 4)
+
+    def tell(self) -> int:
+        return self._base + self._read_pos
+
+    def seek(self, frames: int) -> int:
+        with self._lock:
+            self._base = self._file.seek(frames)
+            self._write_pos = self._read_pos = 0
+            self._eof = False
+
+        return self._base
+
+    def close(self):
+        self._closed = True
+
+        # close can be triggered by garbage collection on any thread, including decoder itself.
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+        with self._lock:
+            self._file.close()
 
 
 class AudioInfo:
     def __init__(self, audio_dir: str):
         self.audio_dir = pathlib.Path(audio_dir)
-        self.loaded_data = sf.SoundFile(self.audio_dir.as_posix())
+        self.loaded_data = RingBufferedFile(sf.SoundFile(self.audio_dir.as_posix()))
+
+        # finalizer only holds the ring, so dropped instances are still released without __del__.
+        self._finalizer = weakref.finalize(self, self.loaded_data.close)
 
         self.total_frame = self.loaded_data.frames
-        self.tag_data = TinyTag.get(self.audio_dir.as_posix())
 
-        self.title = self.tag_data.title if self.tag_data.title else self.audio_dir.name
+        # Placeholder title so playback can start right away, replaced once tags are parsed.
+        self.tag_data = None
+        self.title = self.audio_dir.name
 
+        # SoundFile already knows exact length, so tags are never parsed for duration.
         # saving reference for tiny bit faster access
+        self.duration_tag = round(self.loaded_data.frames / self.loaded_data.samplerate, 1)
+
+        # Duration is constant per track, so progress format is built once here instead of every callback.
+        self.progress_format = f"|{{:0{len(str(self.duration_tag))}.1f}}/{self.duration_tag}"
+
+        threading.Thread(target=self._load_tags, name="TagLoader", daemon=True).start()
+
+    def _load_tags(self):
+        """
+        Parses tags on background, as tinytag reads and parses container on disk.
+        """
+
+        from tinytag import TinyTag
+
         try:
-            self.duration_tag = round(self.tag_data.duration, 1)
-        except TypeError:
-            logger.warning(f"No tag 'duration' exists in {self.title}, calculating estimate.")
-            self.duration_tag = round(self.loaded_data.frames / self.loaded_data.samplerate, 1)
+            self.tag_data = TinyTag.get(self.audio_dir.as_posix(), duration=False, image=False)
+        except Exception as err:
+            logger.warning(f"Failed to read tags of {self.title}: {err}")
+            return
+
+        if self.tag_data.title:
+            self.title = self.tag_data.title
+
+        logger.debug("Audio detail - Title: {}, Duration: {}", self.title, self.duration_tag)
 
-        logger.debug(f"Audio detail - Title: {self.title}, Duration: {self.duration_tag}")
+    def close(self):
+        """
+        Stops decoder and closes loaded file. Safe to call more than once.
+        """
 
-    def __del__(self):
-        self.loaded_data.close()
-        logger.debug(f"Dropping loaded file <{self.title}>")
+        if self._finalizer.alive:
+            self._finalizer()
+            logger.debug("Dropping loaded file <{}>", self.title)
@@ -4,102 +4,113 @@ Callback definitions for sounddevice streams.
 
 from __future__ import annotations
 from typing import TYPE_CHECKING, Callable, Type
-import itertools
-import sounddevice as sd
-from LoggingConfigurator import logger
+import os
+import sys
+import threading
+import numpy as np
+from LoggingConfigurator import log_deferred
 
 if TYPE_CHECKING:
+    import sounddevice as sd
     from .StreamManager import StreamManager
     from .StreamStates import StreamState
 
 
-def stream_callback_closure(stream_manager: StreamManager, raw=False) -> Callable:
-    # Collecting names here to reduce call overhead.
-    last_frame = -1
-    dtype = sd.default.dtype[1]
-    audio_ref = stream_manager.audio_info.loaded_data
-    channel = audio_ref.channels
-    callback = stream_manager.stream_cb
-    audio_info = stream_manager.audio_info
+def _promote_current_thread():
+    """
+    Best-effort attempt to raise priority of calling thread for audio work.
+    Uses MMCSS "Pro Audio" task on Windows and SCHED_FIFO elsewhere; failure is only logged,
+    as the latter usually requires elevated privileges. Priority is dropped with the thread when stream closes.
+    """
 
-    cycle = itertools.cycle((not n for n in range(stream_manager.callback_minimum_cycle)))
+    try:
+        if sys.platform == "win32":
+            import ctypes
 
-    # to reduce load, custom callback will be called every n-th iteration of this generator.
-    # 3rd parameter is time but that is for internal use. Replacing with underscore.
-
-    def stream_cb(data_out, frames: int, _, status: sd.CallbackFlags) -> None:
-        nonlocal last_frame, stream_manager
-        assert not status
+            task_idx = ctypes.c_ulong(0)
+            if not ctypes.WinDLL("avrt", use_last_error=True).AvSetMmThreadCharacteristicsW("Pro Audio", ctypes.byref(task_idx)):
+                raise OSError(ctypes.get_last_error())
+        else:
+            policy = os.SCHED_FIFO
+            os.sched_setscheduler(0, policy, os.sched_param(os.sched_get_priority_min(policy)))
 
-        read = audio_ref.read(frames, fill_value=0) * stream_manager.multiplier
-        try:
-            data_out[:] = read
-        except ValueError:
-            try:
-                data_out[:] = read.reshape(read.shape[0], 1)
-            except Exception:
-                stream_manager.stop_flag = True
-                raise
+    except (OSError, AttributeError) as err:
+        log_deferred("DEBUG", "Audio thread priority unchanged: {!r}", err)
+    else:
+        log_deferred("DEBUG", "Audio thread priority raised.")
 
-        # if last_frame == (current_frame := audio_ref.tell()):
-        #     raise sd.CallbackAbort
 
-        current_frame = audio_ref.tell()
+def stream_callback_closure(stream_manager: StreamManager, dtype="float32") -> Callable:
+    # sounddevice initializes PortAudio on import, deferred until first stream is made.
+    import sounddevice as sd
 
-        if last_frame == current_frame:
-            raise sd.CallbackAbort
+    # Collecting names here to reduce call overhead.
+    audio_ref = stream_manager.audio_info.loaded_data
+    channel = audio_ref.channels
+    callback = stream_manager.stream_cb
+    audio_info = stream_manager.audio_info
+    status_log = stream_manager.status_log
 
-        last_frame = current_frame
+    read_into = audio_ref.read_into
+    tell = audio_ref.tell
+    CallbackStop = sd.CallbackStop
+    get_ident = threading.get_ident
 
-        if next(cycle):
-            callback(audio_info, current_frame)
-            # Stream callback signature for user-supplied callbacks
-            # Providing current_frame and duration to reduce call overhead from user-callback side.
+    # to reduce load, custom callback will be called every n-th callback, starting from first one.
+    every_n = stream_manager.callback_minimum_cycle
+    tick = 0
 
-    def stream_cb_raw(data_out, frames: int, _, status: sd.CallbackFlags) -> None:
-        nonlocal last_frame
+    if every_n < 1:
+        # 0 or less means never. Countdown starts where it can't reach zero, so neither callback nor tell() runs.
+        tick = sys.maxsize
 
-        try:
-            assert not status
-        except AssertionError:
-            logger.critical(str(status))
-            raise
+    # callback thread belongs to PortAudio, so it can only be promoted from inside callback.
+    # Some host APIs spawn new thread on every start, so promoted thread is tracked by ident on manager.
 
-        # if (written := audio_ref.buffer_read_into(data_out, dtype)) < frames:
-        #     data_out[written:] = [[0.0] * channel for _ in range(frames - written)]
-        #     raise sd.CallbackStop
-        #
-        # if last_frame == (current_frame := audio_ref.tell()):
-        #     raise sd.CallbackAbort
+    # 3rd parameter is time but that is for internal use. Replacing with underscore.
 
-        written = audio_ref.buffer_read_into(data_out, dtype)
+    def stream_cb(data_out, frames: int, _, status: sd.CallbackFlags) -> None:
+        nonlocal tick
 
-        if written < frames:
-            data_out[written:] = [[0.0] * channel for _ in range(frames - written)]
-            raise sd.CallbackStop
+        if (thread_id := get_ident()) != stream_manager.promoted_thread:
+            stream_manager.promoted_thread = thread_id
+            _promote_current_thread()
 
-        current_frame = audio_ref.tell()
+        if status:
+            status_log.append(status)
 
-        if last_frame == current_frame:
-            raise sd.CallbackAbort
+        # raw buffer is bytes, viewed once as frames so ring copy, tail zeroing and volume all work in-place.
+        samples = np.frombuffer(data_out, dtype).reshape(-1, channel)
 
-        last_frame = current_frame
+        # ring buffer reports end of file as short read. Unchanged position means decoder underrun,
+        # which is already filled with silence, so position isn't checked here.
+        written = read_into(samples)
 
-        if next(cycle):
-            callback(audio_info, current_frame)
+        # short read only happens once at end of file, so tail handling lives entirely in this one branch.
+        if written < frames:
+            samples[written:] = 0
+            samples *= stream_manager.multiplier
+            raise CallbackStop
+
+        samples *= stream_manager.multiplier
+
+        # counting down to zero, so skipped blocks only pay one decrement.
+        # end of file is detected from short read above, so position is only needed for progress.
+        if tick:
+            tick -= 1
+        else:
+            tick = every_n - 1
+            callback(audio_info, tell())
             # Stream callback signature for user-supplied callbacks
             # Providing current_frame and duration to reduce call overhead from user-callback side.
 
-    logger.debug(f"Using {'Raw' if raw else 'Numpy'} callback.")
-    return stream_cb_raw if raw else stream_cb
+    return stream_cb
 
 
 def finished_callback_wrapper(stream_manager: StreamManager, new_next_state: Type[StreamState]):
     def callback():
-        logger.debug(f"Playback finished. Stop flag: {stream_manager.stop_flag}")
+        # runs on PortAudio's thread, so only state is switched here and rest is signalled to manager.
         stream_manager.new_state(new_next_state)
-
-        if not stream_manager.stop_flag:
-            stream_manager.finished_cb()
+        stream_manager.signal_finished()
 
     return callback
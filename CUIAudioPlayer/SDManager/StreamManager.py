@@ -1,11 +1,13 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Callable, Type
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Type, Tuple
 if TYPE_CHECKING:
     from .AudioObject import AudioInfo
     import sounddevice as sd
 
 from .StreamStates import StreamState, AudioUnloadedState, NoAudioPlayingError
-from LoggingConfigurator import logger
+from LoggingConfigurator import logger, log_deferred
 
 
 class StreamManager:
@@ -20,16 +22,65 @@ class StreamManager:
         self.audio_info: AudioInfo = None
 
         # noinspection PyTypeChecker
-        self.stream: sd.OutputStream = None
+        self.stream: sd.RawOutputStream = None
+
+        # stream is kept across tracks with same format, only callback of loaded track is swapped.
+        self.stream_format: Tuple[int, int] = (0, 0)
+        self.track_callback: Callable = lambda *args: None
 
         self.multiplier = 1
         self.stream_state = AudioUnloadedState
         self.stop_flag = False
 
+        # Non-empty CallbackFlags reported by stream callbacks, bounded so audio thread never blocks on it.
+        self.status_log: deque = deque(maxlen=64)
+
+        # ident of PortAudio thread last promoted by stream callback, 0 if none yet.
+        self.promoted_thread = 0
+
+        # stream's finished callback only signals, work is done on this thread as it's not allowed from stream's.
+        self._finished_event = threading.Event()
+        self._advance = False
+        self._closed = False
+        threading.Thread(target=self._finished_loop, name="FinishedCallback", daemon=True).start()
+
     def new_state(self, status: Type[StreamState]):
-        logger.debug(f"Switching state: {self.stream_state} -> {status}")
+        # also called from finished callback on PortAudio's thread.
+        log_deferred("DEBUG", "Switching state: {} -> {}", self.stream_state, status)
         self.stream_state = status
 
+    def signal_finished(self):
+        """
+        Called from stream's finished callback. Hands remaining work to finished callback thread.
+        """
+
+        self._advance = not self.stop_flag
+        self._finished_event.set()
+
+    def _finished_loop(self):
+        event = self._finished_event
+
+        while True:
+            event.wait()
+            event.clear()
+
+            if self._closed:
+                return
+
+            logger.debug("Playback finished. Advancing: {}", self._advance)
+
+            while self.status_log:
+                logger.warning("Stream status: {}", self.status_log.popleft())
+
+            # Next track is loaded here, as stopping or closing stream isn't allowed
+            # from within its own finished callback.
+            if self._advance:
+                # this thread serves every track end of manager, so failure of one mustn't stop later ones.
+                try:
+                    self.finished_cb()
+                except Exception:
+                    logger.exception("Finished callback raised, waiting for next track end.")
+
     def load_stream(self, audio_location):
         return self.stream_state.load_stream(self, audio_location)
 
@@ -45,8 +96,25 @@ class StreamManager:
         self.stop_flag = not self.stop_flag
         return self.stream_state.pause_stream(self)
 
-    def __del__(self):
-        try:
-            self.stream_state.stop_stream(self)
-        except (RuntimeError, FileNotFoundError, NoAudioPlayingError):
-            pass
+    def close(self):
+        """
+        Closes output stream and loaded file, leaving manager in unloaded state.
+        Must be called before dropping manager, as stream and its callbacks reference each other.
+        """
+
+        self.stop_flag = True
+
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+            self.stream_format = (0, 0)
+
+        if self.audio_info is not None:
+            self.audio_info.close()
+            self.audio_info = None
+
+        self.track_callback = lambda *args: None
+        self.new_state(AudioUnloadedState)
+
+        self._closed = True
+        self._finished_event.set()
@@ -5,7 +5,6 @@ if TYPE_CHECKING:
     
 from .Callbacks import stream_callback_closure, finished_callback_wrapper
 from .AudioObject import AudioInfo
-import sounddevice as sd
 from LoggingConfigurator import logger
 
 
@@ -13,6 +12,9 @@ from LoggingConfigurator import logger
 Finite-State Machine implementation, idea from Python Cookbook 3E.
 """
 
+# Sample format of output stream and its callback, fixed here rather than read from sd.default per load.
+STREAM_DTYPE = "float32"
+
 
 class NoAudioPlayingError(Exception):
     pass
@@ -51,6 +53,8 @@ class AudioUnloadedState(StreamState):
 
     @staticmethod
     def load_stream(stream_manager: StreamManager, audio_dir: str):
+        previous = stream_manager.audio_info
+
         # noinspection PyAttributeOutsideInit
         try:
             stream_manager.audio_info = AudioInfo(audio_dir)
@@ -58,13 +62,50 @@ class AudioUnloadedState(StreamState):
             logger.critical(f"Failed to load <{audio_dir}>!")
             raise err
 
-        # noinspection PyAttributeOutsideInit
-        stream_manager.stream = sd.OutputStream(
-            samplerate=stream_manager.audio_info.loaded_data.samplerate,
-            channels=stream_manager.audio_info.loaded_data.channels,
-            callback=stream_callback_closure(stream_manager),
-            finished_callback=finished_callback_wrapper(stream_manager, StreamStoppedState),
-        )
+        loaded = stream_manager.audio_info.loaded_data
+        stream_format = loaded.samplerate, loaded.channels
+
+        stream_manager.track_callback = stream_callback_closure(stream_manager, dtype=STREAM_DTYPE)
+
+        if stream_manager.stream is not None and stream_manager.stream_format == stream_format:
+            logger.debug("Reusing stream of same format.")
+
+            # stream may have ended by itself, PortAudio needs it stopped before starting again.
+            # flag keeps finished callback from advancing playlist meanwhile.
+            stream_manager.stop_flag = True
+            stream_manager.stream.stop()
+
+        else:
+            # Deferred import, PortAudio initialization isn't needed until first track is loaded.
+            import sounddevice as sd
+
+            if stream_manager.stream is not None:
+                stream_manager.stop_flag = True
+                stream_manager.stream.close()
+
+                # cleared right away, so failure creating new stream won't leave closed one for reuse.
+                stream_manager.stream = None
+                stream_manager.stream_format = (0, 0)
+
+            def stream_cb(*args):
+                return stream_manager.track_callback(*args)
+
+            # noinspection PyAttributeOutsideInit
+            # Fixed block size keeps callback rate predictable, raw stream lets callback build its one frame view per block itself.
+            stream_manager.stream = sd.RawOutputStream(
+                samplerate=stream_format[0],
+                channels=stream_format[1],
+                dtype=STREAM_DTYPE,
+                blocksize=1024,
+                latency="low",
+                callback=stream_cb,
+                finished_callback=finished_callback_wrapper(stream_manager, StreamStoppedState),
+            )
+            stream_manager.stream_format = stream_format
+
+        # stream no longer reads previous track at this point, release it now rather than on collection.
+        if previous is not None:
+            previous.close()
 
         stream_manager.new_state(StreamStoppedState)
 
@@ -82,6 +123,7 @@ class StreamStoppedState(StreamState):
     @staticmethod
     def start_stream(stream_manager: StreamManager):
         logger.debug("Starting Stream.")
+        stream_manager.audio_info.loaded_data.wait_buffered()
         try:
             stream_manager.stream.start()
         except Exception as err:
@@ -136,6 +178,7 @@ class StreamPausedState(StreamState):
     def pause_stream(stream_manager: StreamManager):
         logger.debug("Resuming Stream")
         stream_manager.new_state(StreamPlayingState)
+        stream_manager.audio_info.loaded_data.wait_buffered()
         stream_manager.stream.start()
 
     @staticmethod
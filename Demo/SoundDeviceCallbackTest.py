@@ -1,24 +1,22 @@
 import sounddevice as sd
 import soundfile as sf
-import threading
 
 
 def start_audio_stream(audio_file):
-    event_ = threading.Event()
     modifier_mul = 2
     modifier_add = 0
 
-    def finish_cb():
-        print("Stopped!")
-        event_.set()
-
     with sf.SoundFile(audio_file) as audio:
         last_frame = -1
         # audio.seek(9300000)
 
         def callback(data_out, frames: int, time, status: sd.CallbackFlags) -> None:
             nonlocal last_frame
-            assert not status
+
+            # explicit check, assert would be stripped under -O.
+            if status:
+                print(status)
+                raise sd.CallbackStop
 
             data_out[:] = audio.read(frames, fill_value=0) * modifier_mul
 
@@ -32,9 +30,12 @@ def start_audio_stream(audio_file):
             samplerate=audio.samplerate,
             channels=audio.channels,
             callback=callback,
-            finished_callback=finish_cb,
-        ):
-            event_.wait()
+        ) as stream:
+            # stream goes inactive once callback raises, no need for extra event to wait on.
+            while stream.active:
+                sd.sleep(100)
+
+    print("Stopped!")
 
 
 if __name__ == "__main__":